@@ -19,12 +19,30 @@ __author__ = "l0lsec"
 __version__ = "1.0.0"
 __github__ = "https://github.com/l0lsec"
 
-import requests
 import json
 import sys
 import argparse
+import hashlib
+import io
 import os
-from datetime import datetime, timedelta
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from itertools import groupby, islice
+
+# orjson is optional; it parses large payloads (metrics, hosts) several times faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson is optional; it lets huge lists be read incrementally and cut short
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # Configuration - Can be set via args, env vars, or here directly
 API_KEY = os.environ.get("DD_API_KEY", "")
@@ -33,6 +51,53 @@ APP_KEY = os.environ.get("DD_APP_KEY", "")
 # Datadog API base URL (use .eu for EU, .us3, .us5 for other regions)
 BASE_URL = "https://api.datadoghq.com"
 
+# Number of endpoints probed concurrently, which is also the connection pool size.
+# The rate limit caps throughput anyway, so more workers mostly add handshakes.
+MAX_WORKERS = 8
+
+# Probe Application Key-only endpoints even when no Application Key is given
+PROBE_ALL = False
+
+# Request rate cap so the concurrent fan-out stays under Datadog's rate limits
+MAX_REQUESTS_PER_SECOND = 10
+# Longest a retry waits on a Retry-After header; hourly quotas can ask for 3600s
+RETRY_AFTER_MAX = 5
+
+# Endpoints whose list is only partly displayed but can't be paginated
+# server-side: path -> (list key, items shown). With ijson installed only
+# those items are downloaded and parsed.
+STREAMED_LISTS = {
+    "/api/v1/metrics": ("metrics", 10),
+}
+
+# Opt-in on-disk cache of endpoint results so reruns skip endpoints that are
+# still fresh. Entries hold org data (user emails, key names) in plain JSON.
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "datadog_enum")
+USE_CACHE = False
+REFRESH_CACHE = False
+# Seconds a successful result stays fresh, by path prefix (first match wins)
+CACHE_TTLS = (
+    ("/api/v1/events", 30),
+    ("/api/v2/security_monitoring/signals", 30),
+    ("/api/v1/org", 3600),
+    ("/api/v2/roles", 3600),
+)
+CACHE_DEFAULT_TTL = 300
+# 401/403/404 results are kept briefly so reruns don't hammer forbidden endpoints
+CACHE_ERROR_TTL = 60
+CACHE_STATUSES = (200, 401, 403, 404)
+
+# Shared HTTP session so every endpoint reuses the same keep-alive connections,
+# created by create_session() once arguments are parsed
+_session = None
+
+# One endpoint probe: the report group it prints under, display name, HTTP
+# method, API path, description, an optional printer for its payload and
+# whether it is skipped when no Application Key is given
+EndpointSpec = namedtuple(
+    "EndpointSpec", "group name method path description printer requires_app_key"
+)
+
 # Colors for terminal output
 class Colors:
     GREEN = '\033[92m'
@@ -43,6 +108,32 @@ class Colors:
     BOLD = '\033[1m'
     END = '\033[0m'
 
+class RateLimiter:
+    """Thread-safe token bucket that smooths bursts of requests"""
+    
+    def __init__(self, max_rate, time_period=1.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._tokens = float(max_rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                refill = (now - self._updated) * self.max_rate / self.time_period
+                self._tokens = min(self.max_rate, self._tokens + refill)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self.time_period / self.max_rate
+            time.sleep(wait)
+
+_limiter = RateLimiter(MAX_REQUESTS_PER_SECOND)
+
 def print_header(text):
     print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*60}{Colors.END}")
     print(f"{Colors.BOLD}{Colors.CYAN}{text}{Colors.END}")
@@ -60,360 +151,432 @@ def print_info(text):
 def print_warning(text):
     print(f"{Colors.YELLOW}[!] {text}{Colors.END}")
 
-def get_headers():
-    headers = {
+# How each response status is reported: (print helper, message)
+_STATUS = {
+    200: (print_success, "ACCESSIBLE"),
+    401: (print_error, "UNAUTHORIZED (401)"),
+    403: (print_error, "FORBIDDEN (403)"),
+    404: (print_warning, "NOT FOUND (404)"),
+}
+
+def create_session(pool_size):
+    """Build the shared session with auth headers, pooled connections and retries"""
+    # Imported here so --help and argument errors don't pay for loading requests
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    class CappedRetry(Retry):
+        """Retry that never sleeps longer than RETRY_AFTER_MAX on a Retry-After"""
+        
+        def get_retry_after(self, response):
+            retry_after = super().get_retry_after(response)
+            if retry_after is None:
+                return None
+            return min(retry_after, RETRY_AFTER_MAX)
+    
+    session = requests.Session()
+    session.headers.update({
         "DD-API-KEY": API_KEY,
         "Content-Type": "application/json"
-    }
+    })
     if APP_KEY:
-        headers["DD-APPLICATION-KEY"] = APP_KEY
-    return headers
-
-def test_endpoint(name, method, endpoint, data=None, description=""):
-    """Test if an endpoint is accessible"""
+        session.headers["DD-APPLICATION-KEY"] = APP_KEY
+    # One keep-alive connection per worker
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool_size,
+        # Workers never wait on the pool; a burst beyond it opens extra connections
+        pool_block=False,
+        # Absorb transient throttling/gateway errors instead of reporting them as
+        # missing permissions; the final response is returned if retries run out
+        max_retries=CappedRetry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 502, 503, 504],
+            allowed_methods=["GET", "POST"],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        ),
+    ))
+    return session
+
+def cache_path(method, endpoint):
+    """Cache file for an endpoint, keyed by region, credentials and path
+
+    `endpoint` should be the unformatted EndpointSpec path, so per-run
+    timestamps stay out of the key while paging parameters stay in it.
+    """
+    key = "\0".join((BASE_URL, API_KEY, APP_KEY, method, endpoint))
+    return os.path.join(CACHE_DIR, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+def cache_ttl(endpoint, status):
+    """How long a result for this endpoint and status stays fresh"""
+    if status != 200:
+        return CACHE_ERROR_TTL
+    for prefix, ttl in CACHE_TTLS:
+        if endpoint.startswith(prefix):
+            return ttl
+    return CACHE_DEFAULT_TTL
+
+def cache_load(method, endpoint):
+    """Return a fresh cached (status, payload, age in seconds) triple, or None"""
+    if not USE_CACHE or REFRESH_CACHE:
+        return None
+    try:
+        with open(cache_path(method, endpoint)) as f:
+            entry = json.load(f)
+        status, payload = entry["status"], entry["payload"]
+        age = time.time() - entry["stored"]
+        if age >= cache_ttl(endpoint, status):
+            return None
+    except (OSError, ValueError, KeyError, TypeError):
+        # Unreadable or foreign-shaped entries are treated as a miss
+        return None
+    return status, payload, int(age)
+
+def cache_store(method, endpoint, status, payload):
+    """Save a result to the cache; failures only cost a future cache miss"""
+    if not USE_CACHE or status not in CACHE_STATUSES:
+        return
+    path = cache_path(method, endpoint)
+    entry = {"stored": time.time(), "status": status, "payload": payload}
+    try:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        # Responses can hold sensitive org data, so keep the files private
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def parse_json(response):
+    """Decode a response body in one pass, {} if it is empty or not JSON"""
+    try:
+        if orjson is not None:
+            return orjson.loads(response.content)
+        return response.json()
+    except ValueError:
+        return {}
+
+def stream_list(response, key, limit):
+    """Parse the first `limit` items of a top-level JSON list, then stop reading
+
+    The payload is marked `_truncated` when more items were available.
+    """
+    response.raw.decode_content = True
+    items = list(islice(ijson.items(response.raw, f"{key}.item", use_float=True), limit + 1))
+    return {key: items[:limit], "_truncated": len(items) > limit}
+
+def test_endpoint(name, method, endpoint, data=None, description="", use_cache=True,
+                  cache_key=None):
+    """Request an endpoint and return its result without printing
+
+    Returns a (name, status_code, payload, description, error, cached_age)
+    tuple so results gathered from worker threads can be reported in a fixed
+    order. cached_age is None for live responses. cache_key defaults to
+    the endpoint itself.
+    """
+    import requests
+    
+    use_cache = use_cache and method == "GET"
+    cache_key = cache_key or endpoint
+    if use_cache:
+        cached = cache_load(method, cache_key)
+        if cached is not None:
+            status, payload, age = cached
+            return name, status, payload, description, None, age
+    
     try:
         url = f"{BASE_URL}{endpoint}"
+        streamed = STREAMED_LISTS.get(endpoint.split("?", 1)[0]) if ijson else None
+        _limiter.acquire()
         if method == "GET":
-            response = requests.get(url, headers=get_headers(), timeout=10)
+            response = _session.get(url, timeout=10, stream=streamed is not None)
         elif method == "POST":
-            response = requests.post(url, headers=get_headers(), json=data, timeout=10)
+            response = _session.post(url, json=data, timeout=10)
         
-        if response.status_code == 200:
-            print_success(f"{name}: ACCESSIBLE")
-            if description:
-                print_info(f"  → {description}")
-            return True, response.json() if response.text else {}
-        elif response.status_code == 403:
-            print_error(f"{name}: FORBIDDEN (403)")
-            return False, None
-        elif response.status_code == 401:
-            print_error(f"{name}: UNAUTHORIZED (401)")
-            return False, None
-        elif response.status_code == 404:
-            print_warning(f"{name}: NOT FOUND (404)")
-            return False, None
-        else:
-            print_warning(f"{name}: Status {response.status_code}")
-            return False, None
-    except Exception as e:
-        print_error(f"{name}: Error - {str(e)}")
+        with response:
+            payload = None
+            if response.status_code == 200:
+                if streamed:
+                    payload = stream_list(response, *streamed)
+                else:
+                    payload = parse_json(response)
+        if use_cache:
+            cache_store(method, cache_key, response.status_code, payload)
+        return name, response.status_code, payload, description, None, None
+    except requests.exceptions.RequestException as e:
+        return name, None, None, description, str(e), None
+
+def report_endpoint(result):
+    """Print the outcome of a test_endpoint() call"""
+    name, status, payload, description, error, cached_age = result
+    if error is not None:
+        print_error(f"{name}: Error - {error}")
         return False, None
+    
+    handler, message = _STATUS.get(status, (print_warning, f"Status {status}"))
+    if cached_age is not None:
+        message += f" (cached, {cached_age}s old)"
+    handler(f"{name}: {message}")
+    if status == 200:
+        if description:
+            print_info(f"  → {description}")
+        return True, payload
+    return False, None
 
 def validate_api_key():
     """Validate the API key"""
     print_header("VALIDATING API KEY")
-    success, data = test_endpoint(
+    success, data = report_endpoint(test_endpoint(
         "API Key Validation",
         "GET",
         "/api/v1/validate",
-        description="Confirms the API key is valid"
-    )
+        description="Confirms the API key is valid",
+        # Always checked live: a revoked key must never look valid, and the
+        # live call opens the first pooled connection before the fan-out
+        use_cache=False
+    ))
     if success and data:
         print_info(f"  Valid: {data.get('valid', 'Unknown')}")
     return success
 
-def enumerate_organization():
-    """Get organization information"""
-    print_header("ORGANIZATION INFO")
-    success, data = test_endpoint(
-        "Organization Details",
-        "GET",
-        "/api/v1/org",
-        description="Organization settings and info"
-    )
-    if success and data:
-        org = data.get('org', {})
-        print_info(f"  Name: {org.get('name', 'N/A')}")
-        print_info(f"  Public ID: {org.get('public_id', 'N/A')}")
-        print_info(f"  Created: {org.get('created', 'N/A')}")
-
-def enumerate_users():
-    """List users in the organization"""
-    print_header("USERS")
-    success, data = test_endpoint(
-        "List Users",
-        "GET",
-        "/api/v2/users",
-        description="All users in the organization"
-    )
-    if success and data:
-        users = data.get('data', [])
-        print_info(f"  Found {len(users)} users")
-        for user in users[:10]:  # Show first 10
-            attrs = user.get('attributes', {})
-            print_info(f"    - {attrs.get('email', 'N/A')} ({attrs.get('status', 'N/A')})")
-        if len(users) > 10:
-            print_info(f"    ... and {len(users) - 10} more")
-
-def enumerate_api_keys():
-    """List API keys"""
-    print_header("API KEYS")
-    success, data = test_endpoint(
-        "List API Keys",
-        "GET",
-        "/api/v2/api_keys",
-        description="All API keys in the organization"
-    )
-    if success and data:
-        keys = data.get('data', [])
-        print_info(f"  Found {len(keys)} API keys")
-        for key in keys[:5]:
-            attrs = key.get('attributes', {})
-            print_info(f"    - {attrs.get('name', 'N/A')} (Last 4: ...{attrs.get('last4', 'N/A')})")
-
-def enumerate_app_keys():
-    """List Application keys"""
-    print_header("APPLICATION KEYS")
-    success, data = test_endpoint(
-        "List Application Keys",
-        "GET",
-        "/api/v2/application_keys",
-        description="All application keys"
-    )
-    if success and data:
-        keys = data.get('data', [])
-        print_info(f"  Found {len(keys)} application keys")
-
-def enumerate_dashboards():
-    """List dashboards"""
-    print_header("DASHBOARDS")
-    success, data = test_endpoint(
-        "List Dashboards",
-        "GET",
-        "/api/v1/dashboard",
-        description="All dashboards"
-    )
-    if success and data:
-        dashboards = data.get('dashboards', [])
-        print_info(f"  Found {len(dashboards)} dashboards")
-        for dash in dashboards[:5]:
-            print_info(f"    - {dash.get('title', 'N/A')} (ID: {dash.get('id', 'N/A')})")
-        if len(dashboards) > 5:
-            print_info(f"    ... and {len(dashboards) - 5} more")
-
-def enumerate_monitors():
-    """List monitors"""
-    print_header("MONITORS")
-    success, data = test_endpoint(
-        "List Monitors",
-        "GET",
-        "/api/v1/monitor",
-        description="All configured monitors/alerts"
-    )
-    if success and data:
-        if isinstance(data, list):
-            print_info(f"  Found {len(data)} monitors")
-            for mon in data[:5]:
-                print_info(f"    - {mon.get('name', 'N/A')} (Type: {mon.get('type', 'N/A')})")
-            if len(data) > 5:
-                print_info(f"    ... and {len(data) - 5} more")
-
-def enumerate_hosts():
-    """List hosts"""
-    print_header("HOSTS")
-    success, data = test_endpoint(
-        "List Hosts",
-        "GET",
-        "/api/v1/hosts",
-        description="All monitored hosts"
-    )
-    if success and data:
-        hosts = data.get('host_list', [])
-        print_info(f"  Total hosts: {data.get('total_matching', len(hosts))}")
-        for host in hosts[:5]:
-            print_info(f"    - {host.get('name', 'N/A')} (Apps: {', '.join(host.get('apps', [])[:3])})")
-        if len(hosts) > 5:
-            print_info(f"    ... and more")
-
-def enumerate_metrics():
-    """List available metrics"""
-    print_header("METRICS")
-    success, data = test_endpoint(
-        "List Metrics",
-        "GET",
-        "/api/v1/metrics?from=" + str(int((datetime.now() - timedelta(hours=1)).timestamp())),
-        description="Active metrics in the last hour"
-    )
-    if success and data:
-        metrics = data.get('metrics', [])
-        print_info(f"  Found {len(metrics)} active metrics")
-        for metric in metrics[:10]:
-            print_info(f"    - {metric}")
-        if len(metrics) > 10:
-            print_info(f"    ... and {len(metrics) - 10} more")
-
-def enumerate_integrations():
-    """Check various integrations"""
-    print_header("INTEGRATIONS")
+def print_organization(data):
+    """Print organization information"""
+    org = data.get('org', {})
+    print_info(f"  Name: {org.get('name', 'N/A')}")
+    print_info(f"  Public ID: {org.get('public_id', 'N/A')}")
+    print_info(f"  Created: {org.get('created', 'N/A')}")
+
+def total_count(data, items):
+    """Total size of a paginated v2 list, falling back to the items returned"""
+    page = data.get('meta', {}).get('page', {})
+    return page.get('total_count', page.get('total_filtered_count', len(items)))
+
+def print_users(data):
+    """Print users in the organization"""
+    users = data.get('data', [])
+    total = total_count(data, users)
+    print_info(f"  Found {total} users")
+    for user in users[:10]:  # Show first 10
+        attrs = user.get('attributes', {})
+        print_info(f"    - {attrs.get('email', 'N/A')} ({attrs.get('status', 'N/A')})")
+    if total > 10:
+        print_info(f"    ... and {total - 10} more")
+
+def print_api_keys(data):
+    """Print API keys"""
+    keys = data.get('data', [])
+    print_info(f"  Found {total_count(data, keys)} API keys")
+    for key in keys[:5]:
+        attrs = key.get('attributes', {})
+        print_info(f"    - {attrs.get('name', 'N/A')} (Last 4: ...{attrs.get('last4', 'N/A')})")
+
+def print_app_keys(data):
+    """Print Application keys"""
+    keys = data.get('data', [])
+    print_info(f"  Found {total_count(data, keys)} application keys")
+
+def print_dashboards(data):
+    """Print dashboards"""
+    dashboards = data.get('dashboards', [])
+    # One dashboard past those shown is requested, only to tell if there are more
+    more = len(dashboards) > 5
+    print_info(f"  Found {min(len(dashboards), 5)}{'+' if more else ''} dashboards")
+    for dash in dashboards[:5]:
+        print_info(f"    - {dash.get('title', 'N/A')} (ID: {dash.get('id', 'N/A')})")
+    if more:
+        print_info(f"    ... and more")
+
+def print_monitors(data):
+    """Print monitors"""
+    if isinstance(data, list):
+        print_info(f"  Found {len(data)} monitors")
+        for mon in data[:5]:
+            print_info(f"    - {mon.get('name', 'N/A')} (Type: {mon.get('type', 'N/A')})")
+        if len(data) > 5:
+            print_info(f"    ... and {len(data) - 5} more")
+
+def print_hosts(data):
+    """Print hosts"""
+    hosts = data.get('host_list', [])
+    total = data.get('total_matching', len(hosts))
+    print_info(f"  Total hosts: {total}")
+    for host in hosts[:5]:
+        print_info(f"    - {host.get('name', 'N/A')} (Apps: {', '.join(host.get('apps', [])[:3])})")
+    if total > 5:
+        print_info(f"    ... and {total - 5} more")
+
+def print_metrics(data):
+    """Print available metrics"""
+    metrics = data.get('metrics', [])
+    truncated = data.get('_truncated', False)
+    print_info(f"  Found {len(metrics)}{'+' if truncated else ''} active metrics")
+    for metric in metrics[:10]:
+        print_info(f"    - {metric}")
+    if truncated:
+        print_info(f"    ... and more")
+    elif len(metrics) > 10:
+        print_info(f"    ... and {len(metrics) - 10} more")
+
+def print_synthetics(data):
+    """Print Synthetics tests"""
+    tests = data.get('tests', [])
+    print_info(f"  Found {len(tests)} synthetic tests")
+
+def print_notebooks(data):
+    """Print notebooks"""
+    notebooks = data.get('data', [])
+    print_info(f"  Found {len(notebooks)} notebooks")
+
+def print_slos(data):
+    """Print SLOs"""
+    slos = data.get('data', [])
+    print_info(f"  Found {len(slos)} SLOs")
+
+def print_downtimes(data):
+    """Print downtimes"""
+    if isinstance(data, list):
+        print_info(f"  Found {len(data)} downtimes")
+
+def print_events(data):
+    """Print recent events"""
+    events = data.get('events', [])
+    print_info(f"  Found {len(events)} events in last 24h")
+
+def print_roles(data):
+    """Print roles"""
+    roles = data.get('data', [])
+    print_info(f"  Found {total_count(data, roles)} roles")
+    for role in roles[:5]:
+        attrs = role.get('attributes', {})
+        print_info(f"    - {attrs.get('name', 'N/A')}")
+
+# Every endpoint probe, in report order. `path` may reference the {now},
+# {hour_ago} and {day_ago} timestamps, filled in when the probe is sent.
+#
+# requires_app_key marks the v2 APIs, which reject any request without an
+# Application Key. The v1 read endpoints are documented as needing one too,
+# but they are still probed with a bare API key because checking what that
+# key can reach is what the tool is for.
+_ENDPOINTS = (
+    EndpointSpec("ORGANIZATION INFO", "Organization Details", "GET", "/api/v1/org",
+                 "Organization settings and info", print_organization, False),
+    EndpointSpec("USERS", "List Users", "GET", "/api/v2/users?page[size]=10",
+                 "All users in the organization", print_users, True),
+    EndpointSpec("API KEYS", "List API Keys", "GET", "/api/v2/api_keys?page[size]=5",
+                 "All API keys in the organization", print_api_keys, True),
+    EndpointSpec("APPLICATION KEYS", "List Application Keys", "GET", "/api/v2/application_keys?page[size]=5",
+                 "All application keys", print_app_keys, True),
+    EndpointSpec("ROLES & PERMISSIONS", "List Roles", "GET", "/api/v2/roles?page[size]=5",
+                 "RBAC roles", print_roles, True),
+    EndpointSpec("SERVICE ACCOUNTS", "Service Accounts", "GET", "/api/v2/service_accounts",
+                 "Service accounts", None, True),
+    EndpointSpec("HOSTS", "List Hosts", "GET", "/api/v1/hosts?count=5&start=0",
+                 "All monitored hosts", print_hosts, False),
+    EndpointSpec("METRICS", "List Metrics", "GET", "/api/v1/metrics?from={hour_ago}",
+                 "Active metrics in the last hour", print_metrics, False),
+    EndpointSpec("DASHBOARDS", "List Dashboards", "GET", "/api/v1/dashboard?count=6&start=0",
+                 "All dashboards", print_dashboards, False),
+    EndpointSpec("MONITORS", "List Monitors", "GET", "/api/v1/monitor",
+                 "All configured monitors/alerts", print_monitors, False),
+    EndpointSpec("EVENTS", "Recent Events", "GET", "/api/v1/events?start={day_ago}&end={now}",
+                 "Events from last 24 hours", print_events, False),
+    EndpointSpec("DOWNTIMES", "List Downtimes", "GET", "/api/v1/downtime",
+                 "Scheduled downtimes", print_downtimes, False),
+    EndpointSpec("SERVICE LEVEL OBJECTIVES (SLOs)", "List SLOs", "GET", "/api/v1/slo",
+                 "All SLOs", print_slos, False),
+    EndpointSpec("NOTEBOOKS", "List Notebooks", "GET", "/api/v1/notebooks",
+                 "All notebooks", print_notebooks, False),
+    EndpointSpec("LOGS", "Log Indexes", "GET", "/api/v1/logs/config/indexes",
+                 "Log index configurations", None, False),
+    EndpointSpec("LOGS", "Log Pipelines", "GET", "/api/v1/logs/config/pipelines",
+                 "Log processing pipelines", None, False),
+    EndpointSpec("APM / TRACING", "Services", "GET", "/api/v1/services",
+                 "APM services", None, False),
+    EndpointSpec("SYNTHETICS", "Synthetic Tests", "GET", "/api/v1/synthetics/tests",
+                 "Synthetic monitoring tests", print_synthetics, False),
+    EndpointSpec("REAL USER MONITORING (RUM)", "RUM Applications", "GET", "/api/v2/rum/applications",
+                 "RUM application configurations", None, True),
+    EndpointSpec("INTEGRATIONS", "AWS Integration", "GET", "/api/v1/integration/aws", "", None, False),
+    EndpointSpec("INTEGRATIONS", "Azure Integration", "GET", "/api/v1/integration/azure", "", None, False),
+    EndpointSpec("INTEGRATIONS", "GCP Integration", "GET", "/api/v1/integration/gcp", "", None, False),
+    EndpointSpec("INTEGRATIONS", "Slack Integration", "GET", "/api/v1/integration/slack", "", None, False),
+    EndpointSpec("INTEGRATIONS", "PagerDuty Integration", "GET", "/api/v1/integration/pagerduty", "", None, False),
+    EndpointSpec("INTEGRATIONS", "Webhooks Integration", "GET",
+                 "/api/v1/integration/webhooks/configuration/webhooks", "", None, False),
+    EndpointSpec("SECURITY", "Security Monitoring Rules", "GET", "/api/v2/security_monitoring/rules",
+                 "Security detection rules", None, True),
+    EndpointSpec("SECURITY", "Security Signals", "GET", "/api/v2/security_monitoring/signals",
+                 "Security signals/alerts", None, True),
+)
+
+def report_probe(spec, future):
+    """Print the result of one manifest probe and its payload details"""
+    # A probe that blew up is reported like any other failure so the
+    # remaining results still get printed
+    error = future.exception()
+    if error is not None:
+        result = (spec.name, None, None, spec.description, str(error), None)
+    else:
+        result = future.result()
     
-    integrations = [
-        ("AWS", "/api/v1/integration/aws"),
-        ("Azure", "/api/v1/integration/azure"),
-        ("GCP", "/api/v1/integration/gcp"),
-        ("Slack", "/api/v1/integration/slack"),
-        ("PagerDuty", "/api/v1/integration/pagerduty"),
-        ("Webhooks", "/api/v1/integration/webhooks/configuration/webhooks"),
-    ]
-    
-    for name, endpoint in integrations:
-        test_endpoint(f"{name} Integration", "GET", endpoint)
-
-def enumerate_logs():
-    """Check logs access"""
-    print_header("LOGS")
-    
-    # List log indexes
-    test_endpoint(
-        "Log Indexes",
-        "GET",
-        "/api/v1/logs/config/indexes",
-        description="Log index configurations"
-    )
-    
-    # List log pipelines
-    test_endpoint(
-        "Log Pipelines",
-        "GET",
-        "/api/v1/logs/config/pipelines",
-        description="Log processing pipelines"
-    )
-
-def enumerate_apm():
-    """Check APM access"""
-    print_header("APM / TRACING")
-    
-    test_endpoint(
-        "Services",
-        "GET",
-        "/api/v1/services",
-        description="APM services"
-    )
-
-def enumerate_synthetics():
-    """Check Synthetics access"""
-    print_header("SYNTHETICS")
-    
-    success, data = test_endpoint(
-        "Synthetic Tests",
-        "GET",
-        "/api/v1/synthetics/tests",
-        description="Synthetic monitoring tests"
-    )
-    if success and data:
-        tests = data.get('tests', [])
-        print_info(f"  Found {len(tests)} synthetic tests")
-
-def enumerate_notebooks():
-    """List notebooks"""
-    print_header("NOTEBOOKS")
-    success, data = test_endpoint(
-        "List Notebooks",
-        "GET",
-        "/api/v1/notebooks",
-        description="All notebooks"
-    )
-    if success and data:
-        notebooks = data.get('data', [])
-        print_info(f"  Found {len(notebooks)} notebooks")
-
-def enumerate_slos():
-    """List SLOs"""
-    print_header("SERVICE LEVEL OBJECTIVES (SLOs)")
-    success, data = test_endpoint(
-        "List SLOs",
-        "GET",
-        "/api/v1/slo",
-        description="All SLOs"
-    )
-    if success and data:
-        slos = data.get('data', [])
-        print_info(f"  Found {len(slos)} SLOs")
-
-def enumerate_downtimes():
-    """List downtimes"""
-    print_header("DOWNTIMES")
-    success, data = test_endpoint(
-        "List Downtimes",
-        "GET",
-        "/api/v1/downtime",
-        description="Scheduled downtimes"
-    )
-    if success and data:
-        if isinstance(data, list):
-            print_info(f"  Found {len(data)} downtimes")
-
-def enumerate_events():
-    """Get recent events"""
-    print_header("EVENTS")
-    now = int(datetime.now().timestamp())
-    start = now - 86400  # Last 24 hours
-    success, data = test_endpoint(
-        "Recent Events",
-        "GET",
-        f"/api/v1/events?start={start}&end={now}",
-        description="Events from last 24 hours"
-    )
-    if success and data:
-        events = data.get('events', [])
-        print_info(f"  Found {len(events)} events in last 24h")
-
-def enumerate_security():
-    """Check security-related endpoints"""
-    print_header("SECURITY")
-    
-    test_endpoint(
-        "Security Monitoring Rules",
-        "GET",
-        "/api/v2/security_monitoring/rules",
-        description="Security detection rules"
-    )
+    success, data = report_endpoint(result)
+    if spec.printer and success and data:
+        try:
+            spec.printer(data)
+        except (AttributeError, KeyError, TypeError) as e:
+            print_warning(f"  Unexpected response format: {e}")
+
+def enumerate_all():
+    """Probe every endpoint concurrently and report in manifest order"""
+    # One clock read shared by every time-windowed path
+    now = int(time.time())
+    times = {
+        "now": now,
+        "hour_ago": now - 3600,
+        "day_ago": now - 86400,  # Last 24 hours
+    }
     
-    test_endpoint(
-        "Security Signals",
-        "GET",
-        "/api/v2/security_monitoring/signals",
-        description="Security signals/alerts"
-    )
-
-def enumerate_rum():
-    """Check RUM access"""
-    print_header("REAL USER MONITORING (RUM)")
+    # Endpoints that need an Application Key would only return 403s without one
+    probe_all = APP_KEY or PROBE_ALL
+    plan = tuple(spec for spec in _ENDPOINTS if probe_all or not spec.requires_app_key)
+    skipped = [spec.group for spec in _ENDPOINTS if spec.requires_app_key and not probe_all]
+    if skipped:
+        print_warning(f"Skipping endpoints that require an Application Key: "
+                      f"{', '.join(dict.fromkeys(skipped))}")
+        print_warning("Pass --probe-all to confirm they are forbidden for this API key")
     
-    test_endpoint(
-        "RUM Applications",
-        "GET",
-        "/api/v2/rum/applications",
-        description="RUM application configurations"
-    )
-
-def enumerate_service_accounts():
-    """List service accounts"""
-    print_header("SERVICE ACCOUNTS")
-    success, data = test_endpoint(
-        "Service Accounts",
-        "GET",
-        "/api/v2/service_accounts",
-        description="Service accounts"
-    )
-
-def enumerate_roles():
-    """List roles"""
-    print_header("ROLES & PERMISSIONS")
-    success, data = test_endpoint(
-        "List Roles",
-        "GET",
-        "/api/v2/roles",
-        description="RBAC roles"
-    )
-    if success and data:
-        roles = data.get('data', [])
-        print_info(f"  Found {len(roles)} roles")
-        for role in roles[:5]:
-            attrs = role.get('attributes', {})
-            print_info(f"    - {attrs.get('name', 'N/A')}")
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    futures = [
+        executor.submit(test_endpoint, spec.name, spec.method,
+                        spec.path.format(**times), description=spec.description,
+                        cache_key=spec.path)
+        for spec in plan
+    ]
+    try:
+        for group, probes in groupby(zip(plan, futures), key=lambda p: p[0].group):
+            # Render each group in memory and emit it with a single write
+            buf = io.StringIO()
+            with redirect_stdout(buf):
+                print_header(group)
+                for spec, future in probes:
+                    report_probe(spec, future)
+            sys.stdout.write(buf.getvalue())
+            sys.stdout.flush()
+    except BaseException:
+        # On Ctrl-C drop the queued probes instead of waiting for all of them;
+        # cancelling by hand is shutdown(cancel_futures=True) before Python 3.9
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+        raise
+    executor.shutdown()
 
 def main():
-    global API_KEY, APP_KEY, BASE_URL
+    global API_KEY, APP_KEY, BASE_URL, USE_CACHE, REFRESH_CACHE, MAX_WORKERS, PROBE_ALL, _session
     
     parser = argparse.ArgumentParser(
         description="Enumerate Datadog API key permissions and accessible resources",
@@ -424,6 +587,7 @@ Examples:
   python3 datadog_enum.py YOUR_API_KEY YOUR_APP_KEY
   python3 datadog_enum.py YOUR_API_KEY YOUR_APP_KEY --region eu
   python3 datadog_enum.py YOUR_API_KEY --region us3
+  python3 datadog_enum.py YOUR_API_KEY YOUR_APP_KEY --cache
   
 Environment Variables:
   DD_API_KEY - Datadog API Key
@@ -434,14 +598,31 @@ Environment Variables:
     parser.add_argument("app_key", nargs="?", help="Datadog Application Key (optional)")
     parser.add_argument("--region", "-r", choices=["us1", "us3", "us5", "eu", "ap1"], 
                         default="us1", help="Datadog region (default: us1)")
+    parser.add_argument("--workers", "-w", type=int, default=MAX_WORKERS,
+                        help=f"Concurrent requests / open connections (default: {MAX_WORKERS})")
+    parser.add_argument("--probe-all", action="store_true",
+                        help="Without an Application Key, still probe endpoints that require one")
+    parser.add_argument("--cache", action="store_true",
+                        help=f"Reuse fresh results from, and save results to, {CACHE_DIR}. "
+                             "Cached files contain org data (user emails, key names) in plain text")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Like --cache, but ignore cached results and store fresh ones")
     
     args = parser.parse_args()
     
+    # Output is flushed explicitly once per report group
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False)
+    
     # Set keys from args or fall back to env vars
     if args.api_key:
         API_KEY = args.api_key
     if args.app_key:
         APP_KEY = args.app_key
+    MAX_WORKERS = max(1, args.workers)
+    USE_CACHE = args.cache or args.refresh
+    PROBE_ALL = args.probe_all
+    REFRESH_CACHE = args.refresh
     
     if not API_KEY:
         print(f"{Colors.RED}Error: API Key is required{Colors.END}")
@@ -458,6 +639,7 @@ Environment Variables:
         "ap1": "https://api.ap1.datadoghq.com",
     }
     BASE_URL = regions.get(args.region, "https://api.datadoghq.com")
+    _session = create_session(MAX_WORKERS)
     
     print(f"""
 {Colors.BOLD}{Colors.CYAN}
@@ -482,9 +664,15 @@ Environment Variables:
     ╚══════════════════════════════════════════════════════════╝{Colors.END}
 """)
     print_info(f"Using API endpoint: {BASE_URL}")
+    if USE_CACHE:
+        print_warning(f"Caching results, including org data, in {CACHE_DIR}")
     
     if not APP_KEY:
-        print_warning("No Application Key provided - some endpoints may be inaccessible")
+        if PROBE_ALL:
+            print_warning("No Application Key provided - some endpoints may be inaccessible")
+        else:
+            print_warning("No Application Key provided - v2 endpoints will be skipped "
+                          "and v1 endpoints may be inaccessible")
         print_warning("API keys can only submit data, Application keys are needed to read data")
     
     # Run enumeration
@@ -492,31 +680,15 @@ Environment Variables:
         print_error("API Key validation failed. Check your key and try again.")
         sys.exit(1)
     
-    # Enumerate everything
-    enumerate_organization()
-    enumerate_users()
-    enumerate_api_keys()
-    enumerate_app_keys()
-    enumerate_roles()
-    enumerate_service_accounts()
-    enumerate_hosts()
-    enumerate_metrics()
-    enumerate_dashboards()
-    enumerate_monitors()
-    enumerate_events()
-    enumerate_downtimes()
-    enumerate_slos()
-    enumerate_notebooks()
-    enumerate_logs()
-    enumerate_apm()
-    enumerate_synthetics()
-    enumerate_rum()
-    enumerate_integrations()
-    enumerate_security()
+    # Enumerate everything; show what's been printed so far while the probes run
+    sys.stdout.flush()
+    enumerate_all()
     
     print_header("ENUMERATION COMPLETE")
     print_info("Review the results above to see what your API key can access")
     print_info("Green [✓] = Accessible, Red [✗] = Forbidden/Unauthorized")
+    
+    _session.close()
 
 if __name__ == "__main__":
     main()